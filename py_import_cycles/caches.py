@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Sequence
+
+from .log import logger
+
+
+def make_digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _read_digest(filepath: str) -> None | str:
+    try:
+        with open(filepath, "rb") as f:
+            return make_digest(f.read())
+    except OSError:
+        return None
+
+
+def _is_valid_entry(entry: Any) -> bool:
+    # [[mtime_ns, size], digest, data]
+    return (
+        isinstance(entry, list)
+        and len(entry) == 3
+        and isinstance(entry[0], list)
+        and len(entry[0]) == 2
+        and all(isinstance(value, int) for value in entry[0])
+        and isinstance(entry[1], str)
+    )
+
+
+class FilesCache:
+    """Persist JSON serializable data per file across runs
+
+    An entry is valid as long as the modification time and the size of its file are unchanged.
+    Otherwise the digest of the file content decides, eg. if the file was only touched or checked
+    out again. The whole cache is invalidated if the version differs, eg. if the format of the
+    data or the options which lead to the data have changed. Only entries which are used in a run
+    are saved.
+    """
+
+    def __init__(self, filepath: Path, version: str) -> None:
+        self._filepath = filepath
+        self._version = version
+        self._entries = self._load(filepath, version)
+        self._used_entries: dict[str, list[Any]] = {}
+        self._stats: dict[str, list[int]] = {}
+
+    @staticmethod
+    def _load(filepath: Path, version: str) -> dict[str, list[Any]]:
+        try:
+            with filepath.open(encoding="utf-8") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.debug("Cannot load cache %s: %s", filepath, e)
+            return {}
+
+        if not isinstance(raw, dict) or raw.get("version") != version:
+            return {}
+
+        entries = raw.get("entries", {})
+        if not isinstance(entries, dict) or not all(
+            isinstance(key, str) and _is_valid_entry(entry) for key, entry in entries.items()
+        ):
+            # The cache is only an optimization: Never fail on a broken file, it's rewritten
+            # by the next save
+            logger.debug("Cannot load cache %s: Malformed entries", filepath)
+            return {}
+
+        return entries
+
+    def get(self, path: Path) -> Any:
+        return self.get_many([path])[0]
+
+    def get_many(self, paths: Sequence[Path]) -> Sequence[Any]:
+        data: list[Any] = [None] * len(paths)
+        unverified: list[tuple[int, str, list[Any]]] = []
+        for idx, path in enumerate(paths):
+            key = str(path)
+            if (entry := self._find_entry(key)) is None:
+                continue
+
+            if entry[0] == self._stats[key]:
+                self._used_entries[key] = entry
+                data[idx] = entry[2]
+            else:
+                unverified.append((idx, key, entry))
+
+        if not unverified:
+            return data
+
+        # Reading and hashing the files is I/O bound, thus it's done by a pool of threads
+        with ThreadPoolExecutor(max_workers=min(32, len(unverified))) as executor:
+            for (idx, key, entry), digest in zip(
+                unverified,
+                executor.map(_read_digest, [key for _idx, key, _entry in unverified]),
+            ):
+                if digest == entry[1]:
+                    self._used_entries[key] = [self._stats[key], digest, entry[2]]
+                    data[idx] = entry[2]
+
+        return data
+
+    def _find_entry(self, key: str) -> None | list[Any]:
+        try:
+            stat_result = os.stat(key)
+        except OSError:
+            return None
+
+        self._stats[key] = stat = [stat_result.st_mtime_ns, stat_result.st_size]
+
+        if (entry := self._entries.get(key)) is None or entry[0][1] != stat[1]:
+            # Different sizes: The content has changed for sure
+            return None
+
+        return entry
+
+    def set(self, path: Path, digest: str, data: Any) -> None:
+        # The stats of 'get' are used: If the file is changed in the meantime, the entry becomes
+        # invalid and the file is processed again in the next run.
+        key = str(path)
+        if (stat := self._stats.get(key)) is not None:
+            self._used_entries[key] = [stat, digest, data]
+
+    def save(self) -> None:
+        self._filepath.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=self._filepath.parent,
+            prefix=f".{self._filepath.name}.",
+            delete=False,
+        ) as f:
+            json.dump({"version": self._version, "entries": self._used_entries}, f)
+        os.replace(f.name, self._filepath)
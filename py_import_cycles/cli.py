@@ -8,12 +8,25 @@ from pathlib import Path
 from typing import Sequence
 
 from . import __version__
+from .caches import FilesCache
 from .cycles import detect_cycles
 from .files import get_outputs_filepaths, iter_python_files
 from .graphs import make_graph
 from .log import logger, setup_logging
 from .modules import Module, ModuleFactory
-from .visitors import visit_python_file
+from .visitors import get_cache_version, visit_python_files, VisitOptions
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from e
+
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value!r}")
+
+    return number
 
 
 def _parse_arguments() -> argparse.Namespace:
@@ -77,6 +90,25 @@ def _parse_arguments() -> argparse.Namespace:
         default=False,
         help="Don't count imports in 'if typing.TYPE_CHECKING:' guards.",
     )
+    parser.add_argument(
+        "--only-toplevel",
+        action="store_true",
+        default=False,
+        help="Only count imports of the module scope, ie. skip imports in functions or classes.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="Number of processes reading and parsing Python files (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Don't use or update the cached import statements of unchanged files.",
+    )
 
     return parser.parse_args()
 
@@ -101,13 +133,30 @@ def main() -> int:
     logger.info("Visit Python files, get imports by module")
     module_factory = ModuleFactory(project_path, packages)
 
+    visit_options = VisitOptions(
+        skip_type_checking=args.skip_type_checking_guard,
+        only_toplevel=args.only_toplevel,
+    )
+    cache = (
+        None
+        if args.no_cache
+        else FilesCache(outputs_filepaths.cache, get_cache_version(visit_options))
+    )
+
     imports_by_module = {
         visited.module: visited.imports
-        for path in python_files
-        if (visited := visit_python_file(module_factory, path, args.skip_type_checking_guard))
-        is not None
+        for visited in visit_python_files(
+            module_factory,
+            python_files,
+            visit_options,
+            cache,
+            args.jobs,
+        )
     }
 
+    if cache is not None:
+        cache.save()
+
     if _debug():
         # Avoid execution of pprint.pformat call if not debug
         logger.debug(
@@ -121,7 +170,11 @@ def main() -> int:
     unsorted_cycles = set(detect_cycles(args.strategy, imports_by_module))
 
     logger.info("Sort import cycles")
-    sorted_cycles = sorted(unsorted_cycles, key=lambda t: (len(t), t[0].name))
+    # Sorted by all names because cycles of the same length may start with the same module.
+    # Otherwise their order depends on the set, ie. on the hash seed of the run.
+    sorted_cycles = sorted(
+        unsorted_cycles, key=lambda t: (len(t), tuple(module.name for module in t))
+    )
 
     logger.info("Close cycles")
     import_cycles: Sequence[tuple[Module, ...]] = [
@@ -14,5 +14,10 @@ def detect_cycles(
     if strategy == "dfs":
         return depth_first_search(graph)
     if strategy == "tarjan":
-        return (scc for scc in strongly_connected_components(graph) if len(scc) > 1)
+        # A single module is a cycle only if it imports itself
+        return (
+            scc
+            for scc in strongly_connected_components(graph)
+            if len(scc) > 1 or scc[0] in graph.get(scc[0], [])
+        )
     raise NotImplementedError()
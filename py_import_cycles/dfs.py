@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from typing import Iterator, List, Mapping, Sequence, Set, TypeVar
+from typing import Dict, Iterator, List, Mapping, Sequence, Set, Tuple, TypeVar
 
 from .type_defs import Comparable
 
@@ -10,18 +10,35 @@ T = TypeVar("T", bound=Comparable)
 def depth_first_search(graph: Mapping[T, Sequence[T]]) -> Iterator[tuple[T, ...]]:
     visited: Set[T] = set()
 
-    def _dfs_util(vertex_u: T, path: List[T]) -> Iterator[tuple[T, ...]]:
-        if vertex_u in visited:
-            return
-
-        for vertex_v in graph.get(vertex_u, []):
-            if vertex_v in path:
-                yield tuple(path[path.index(vertex_v) :])
-                continue
-
-            yield from _dfs_util(vertex_v, path + [vertex_v])
-
-        visited.add(vertex_u)
-
     for vertex in sorted(graph):
-        yield from _dfs_util(vertex, [])
+        if vertex in visited:
+            continue
+
+        # The path does not contain the start vertex. Every other entry of the stack has exactly
+        # one corresponding entry in the path. The positions of the vertices within the path are
+        # tracked, thus a cycle is found and sliced off without scanning the path.
+        path: List[T] = []
+        path_positions: Dict[T, int] = {}
+        stack: List[Tuple[T, Iterator[T]]] = [(vertex, iter(graph.get(vertex, [])))]
+
+        while stack:
+            vertex_u, successors = stack[-1]
+
+            for vertex_v in successors:
+                if (position := path_positions.get(vertex_v)) is not None:
+                    yield tuple(path[position:])
+                    continue
+
+                if vertex_v in visited:
+                    continue
+
+                path_positions[vertex_v] = len(path)
+                path.append(vertex_v)
+                stack.append((vertex_v, iter(graph.get(vertex_v, []))))
+                break
+
+            else:
+                stack.pop()
+                if stack:
+                    del path_positions[path.pop()]
+                visited.add(vertex_u)
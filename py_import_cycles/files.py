@@ -1,26 +1,58 @@
 #!/usr/bin/env python3
 
+import os
 from pathlib import Path
 from typing import Iterator, NamedTuple, Sequence
 
 
 def iter_python_files(project_path: Path, packages: Sequence[Path]) -> Iterator[Path]:
     if packages:
+        # Packages may be nested within each other, eg. '--packages a a/b'. Drop the duplicates
+        # while walking instead of visiting the same files twice or collecting all paths upfront.
+        seen: set[Path] = set()
         for pkg in packages:
-            yield from (p.resolve() for p in (project_path / pkg).glob("**/*.py"))
+            for path in _iter_python_files(project_path / pkg):
+                if path not in seen:
+                    seen.add(path)
+                    yield path
         return
 
-    for p in project_path.glob("**/*.py"):
-        yield p.resolve()
+    yield from _iter_python_files(project_path)
+
+
+def _iter_python_files(path: Path) -> Iterator[Path]:
+    # The directory entries of os.scandir already know their type, ie. there's no extra stat
+    # call per entry as for Path.glob or Path.is_dir. Symlinks are not followed, thus resolving
+    # the top-level directory once is sufficient for getting resolved paths of all files.
+    stack: list[str | Path] = [path.resolve()]
+    while stack:
+        dir_paths: list[str] = []
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        dir_paths.append(entry.path)
+                    elif entry.name.endswith(".py"):
+                        yield Path(entry.path)
+        except OSError:
+            # Eg. vanished, not a directory or not readable: Skip the directory
+            continue
+
+        # Reversed in order to walk the sub-directories in the order of the directory entries
+        stack.extend(reversed(dir_paths))
 
 
 class OutputsFilepaths(NamedTuple):
     log: Path
     graph: Path
+    cache: Path
 
 
 def get_outputs_filepaths(project_path: Path, packages: Sequence[Path]) -> OutputsFilepaths:
-    target_dir = Path.home() / Path(".local", "py_import_cycles", "outputs")
+    base_dir = Path.home() / Path(".local", "py_import_cycles")
+    target_dir = base_dir / "outputs"
     target_dir.mkdir(parents=True, exist_ok=True)
 
     filename_parts = list(project_path.parts[1:])
@@ -32,4 +64,5 @@ def get_outputs_filepaths(project_path: Path, packages: Sequence[Path]) -> Outpu
     return OutputsFilepaths(
         log=target_dir / filename.with_suffix(".log"),
         graph=target_dir / filename.with_suffix(".gv"),
+        cache=base_dir / "cache" / filename.with_suffix(".json"),
     )
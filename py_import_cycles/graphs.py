@@ -7,8 +7,6 @@ from collections import defaultdict
 from pathlib import Path
 from typing import DefaultDict, Iterable, Iterator, Literal, Mapping, NamedTuple, Sequence, TypeVar
 
-from graphviz import Digraph
-
 from .log import logger
 from .modules import Module, PyModule
 from .type_defs import Comparable
@@ -36,29 +34,35 @@ def make_graph(
         logger.debug("No such edges for graph")
         return
 
-    d = Digraph("unix", filename=filepath)
+    _write_graph(filepath, edges)
 
-    with d.subgraph() as ds:
-        for edge in edges:
-            ds.node(
-                str(edge.from_module.name),
-                shape=_get_shape(edge.from_module),
-            )
+    # Only needed for viewing graphs, thus not imported by every run of the CLI
+    from graphviz import Source  # pylint: disable=import-outside-toplevel
 
-            ds.node(
-                str(edge.to_module.name),
-                shape=_get_shape(edge.to_module),
-            )
+    Source.from_file(filepath).view()
 
-            ds.attr("edge", color=edge.edge_color)
 
-            if edge.title:
-                ds.edge(str(edge.from_module.name), str(edge.to_module.name), edge.title)
-            else:
-                ds.edge(str(edge.from_module.name), str(edge.to_module.name))
+def _write_graph(filepath: Path, edges: Sequence[ImportEdge]) -> None:
+    # Write the DOT language directly instead of passing every node and edge through the
+    # quoting and formatting layers of 'graphviz.Digraph'. All IDs and values are quoted.
+    with filepath.open("w", encoding="utf-8") as f:
+        write = f.write
+        write("digraph unix {\n\t{\n")
+
+        # Declare every module once instead of twice per edge
+        for module in dict.fromkeys(
+            m for edge in edges for m in (edge.from_module, edge.to_module)
+        ):
+            write(f'\t\t"{module.name}" [shape="{_get_shape(module)}"]\n')
+
+        for edge in edges:
+            label = f'label="{edge.title}" ' if edge.title else ""
+            write(
+                f'\t\t"{edge.from_module.name}" -> "{edge.to_module.name}"'
+                f' [{label}color="{edge.edge_color}"]\n'
+            )
 
-    d.unflatten(stagger=50)
-    d.view()
+        write("\t}\n}\n")
 
 
 def _get_shape(module: Module) -> str:
@@ -73,9 +77,12 @@ def pairwise(iterable: Iterable[T]) -> Iterator[tuple[T, T]]:
 
 
 def dedup_edges(cycles: Iterable[tuple[TC, ...]]) -> Sequence[tuple[TC, TC]]:
-    edges: set[tuple[TC, TC]] = set()
+    # Used as an ordered set: The edges keep the order of the given cycles instead of the
+    # iteration order of a set of hashed module names
+    edges: dict[tuple[TC, TC], None] = {}
     for cycle in cycles:
-        edges |= frozenset(pairwise(cycle))
+        for edge in pairwise(cycle):
+            edges[edge] = None
     return list(edges)
 
 
@@ -139,7 +146,8 @@ def _make_dfs_import_edges(
 def _make_only_cycles_edges(
     import_cycles: Sequence[tuple[Module, ...]],
 ) -> Sequence[ImportEdge]:
-    edges: set[ImportEdge] = set()
+    # Keyed by the stable identity of an edge; the insertion order follows the cycles
+    edges: dict[tuple[Module, Module, str], ImportEdge] = {}
     for nr, import_cycle in enumerate(import_cycles, start=1):
         color = "#{:02x}{:02x}{:02x}".format(  # pylint: disable=consider-using-f-string
             random.randint(50, 200),
@@ -147,15 +155,12 @@ def _make_only_cycles_edges(
             random.randint(50, 200),
         )
 
+        title = f"{str(nr)} ({len(import_cycle) - 1})"
         start_module = import_cycle[0]
         for next_module in import_cycle[1:]:
-            edges.add(
-                ImportEdge(
-                    f"{str(nr)} ({len(import_cycle) - 1})",
-                    start_module,
-                    next_module,
-                    color,
-                )
+            edges.setdefault(
+                (start_module, next_module, title),
+                ImportEdge(title, start_module, next_module, color),
             )
             start_module = next_module
-    return sorted(edges)
+    return list(edges.values())
@@ -2,25 +2,45 @@
 
 from __future__ import annotations
 
+import os
+import stat
+import sys
 from pathlib import Path
-from typing import Final, NamedTuple, Sequence
+from typing import Final, Mapping, NamedTuple, Sequence
 
 
 class ModuleName:
     """This class is inspired by pathlib.Path"""
 
     def __init__(self, *parts: str | ModuleName) -> None:
+        # The same names occur in many module names. Interning them saves memory and lets the
+        # comparisons of the parts succeed on identity.
         self._parts: Final[tuple[str, ...]] = tuple(
             entry
             for part in parts
-            for entry in (part.parts if isinstance(part, ModuleName) else part.split("."))
+            for entry in (
+                part.parts
+                if isinstance(part, ModuleName)
+                else (sys.intern(name) for name in part.split("."))
+            )
         )
+        # Module names are used as (part of the) keys of all graphs, sets and mappings
+        self._hash: Final[int] = hash(self._parts)
+        # The dotted names make up the nodes and edges of the graph and the outputs; they are
+        # built on first use only and then shared
+        self._name: None | str = None
+
+    def __reduce__(self) -> tuple[type[ModuleName], tuple[str, ...]]:
+        # String hashes differ between processes, thus do not pickle the cached hash
+        return ModuleName, self._parts
 
     def __str__(self) -> str:
-        return ".".join(self._parts)
+        if self._name is None:
+            self._name = sys.intern(".".join(self._parts))
+        return self._name
 
     def __hash__(self) -> int:
-        return hash(self._parts)
+        return self._hash
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, ModuleName):
@@ -75,6 +95,16 @@ class ModuleFactory:
     def __init__(self, project_path: Path, packages: list[Path]) -> None:
         self._project_path = project_path
         self._pkgs_names = self._find_package_names(project_path, packages)
+        # Used for every visited file, thus made absolute once
+        self._abs_pkgs_paths = [
+            (name, project_path.joinpath(path)) for name, path in self._pkgs_names.items()
+        ]
+        # The same modules are imported by many files of a project. Resolving a module name
+        # needs some file system calls, thus the results (and failures) are memoized.
+        self._modules_by_name: dict[ModuleName, None | Module] = {}
+        # Most of the imported modules live in a few directories. Each directory is listed once
+        # instead of probing every candidate path with its own stat call.
+        self._dir_entries_by_path: dict[Path, Mapping[str, bool]] = {}
 
     @staticmethod
     def _find_package_names(project_path: Path, packages: list[Path]) -> dict[str, Path]:
@@ -92,6 +122,17 @@ class ModuleFactory:
         return pkgs_names
 
     def make_module_from_name(self, module_name: ModuleName) -> Module:
+        try:
+            module = self._modules_by_name[module_name]
+        except KeyError:
+            module = self._modules_by_name[module_name] = self._find_module_by_name(module_name)
+
+        if module is None:
+            raise ValueError(module_name)
+
+        return module
+
+    def _find_module_by_name(self, module_name: ModuleName) -> None | Module:
         def _get_sanitized_rel_module_path(module_name: ModuleName) -> Path:
             if module_name and module_name.parts[0] in self._pkgs_names:
                 return Path(*self._pkgs_names[module_name.parts[0]].parts) / Path(
@@ -109,8 +150,8 @@ class ModuleFactory:
 
         module_path = self._project_path.joinpath(_get_sanitized_rel_module_path(module_name))
 
-        if module_path.is_dir():
-            if (init_module_path := module_path / "__init__.py").exists():
+        if self._is_dir(module_path):
+            if self._exists(init_module_path := module_path / "__init__.py"):
                 return RegularPackage(
                     path=init_module_path,
                     name=module_name.joinname("__init__"),
@@ -121,32 +162,63 @@ class ModuleFactory:
                 name=module_name,
             )
 
-        if (py_module_path := module_path.with_suffix(".py")).exists():
+        if self._exists(py_module_path := module_path.with_suffix(".py")):
             return PyModule(
                 path=py_module_path,
                 name=module_name,
             )
 
-        raise ValueError(module_name)
+        return None
+
+    def _get_dir_entries(self, path: Path) -> Mapping[str, bool]:
+        # Maps the names of the directory entries to whether they are directories
+        try:
+            return self._dir_entries_by_path[path]
+        except KeyError:
+            pass
+
+        try:
+            with os.scandir(path) as entries:
+                dir_entries = {entry.name: entry.is_dir() for entry in entries}
+        except OSError:
+            dir_entries = {}
+
+        self._dir_entries_by_path[path] = dir_entries
+        return dir_entries
+
+    def _is_dir(self, path: Path) -> bool:
+        if not path.name:
+            return path.is_dir()
+        return self._get_dir_entries(path.parent).get(path.name, False)
+
+    def _exists(self, path: Path) -> bool:
+        if not path.name:
+            return path.exists()
+        return path.name in self._get_dir_entries(path.parent)
 
     def make_module_from_path(self, module_path: Path) -> Module:
         def _get_sanitized_module_name(module_path: Path) -> ModuleName:
             module_path = module_path.with_suffix("")
-            for name, path in self._pkgs_names.items():
-                abs_module_path = self._project_path.joinpath(path)
+            for name, abs_module_path in self._abs_pkgs_paths:
                 if module_path.is_relative_to(abs_module_path):
                     return ModuleName(name, *module_path.relative_to(abs_module_path).parts)
             return ModuleName(*module_path.relative_to(self._project_path).parts)
 
         module_name = _get_sanitized_module_name(module_path)
 
-        if module_path.is_dir():
+        # A single stat call instead of one for 'is_dir' and one for 'is_file'
+        try:
+            mode = module_path.stat().st_mode
+        except OSError as e:
+            raise ValueError(module_path) from e
+
+        if stat.S_ISDIR(mode):
             return NamespacePackage(
                 path=module_path,
                 name=module_name,
             )
 
-        if module_path.is_file() and module_path.suffix == ".py":
+        if stat.S_ISREG(mode) and module_path.suffix == ".py":
             if module_path.stem == "__init__":
                 return RegularPackage(
                     path=module_path,
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from typing import Hashable, List, Mapping, MutableMapping, Sequence, Tuple, TypeVar
+from typing import Hashable, Iterator, List, Mapping, MutableMapping, Sequence, Set, Tuple, TypeVar
 
 T = TypeVar("T", bound=Hashable)
 
@@ -11,13 +11,18 @@ def strongly_connected_components(graph: Mapping[T, Sequence[T]]) -> Sequence[Tu
     for finding the strongly connected components of a graph.
 
     Based on: http://en.wikipedia.org/wiki/Tarjan%27s_strongly_connected_components_algorithm
+
+    The recursion of 'strongconnect' is unrolled into an explicit stack of nodes and their
+    pending successors in order to handle arbitrarily long import chains.
     """
 
     index_counter: List[int] = [0]
     stack: List[T] = []
+    on_stack: Set[T] = set()
     lowlinks: MutableMapping[T, int] = {}
     index: MutableMapping[T, int] = {}
     result: List[Tuple[T, ...]] = []
+    work_stack: List[Tuple[T, Iterator[T]]] = []
 
     def strongconnect(node: T) -> None:
         # set the depth index for this node to the smallest unused index
@@ -25,21 +30,15 @@ def strongly_connected_components(graph: Mapping[T, Sequence[T]]) -> Sequence[Tu
         lowlinks[node] = index_counter[0]
         index_counter[0] += 1
         stack.append(node)
+        on_stack.add(node)
+        work_stack.append((node, iter(graph.get(node, []))))
 
-        # Consider successors of `node`
-        try:
-            successors = graph[node]
-        except KeyError:
-            successors = []
-        for successor in successors:
-            if successor not in lowlinks:
-                # Successor has not yet been visited; recurse on it
-                strongconnect(successor)
-                lowlinks[node] = min(lowlinks[node], lowlinks[successor])
-            elif successor in stack:
-                # the successor is in the stack and hence in the current
-                # strongly connected component (SCC)
-                lowlinks[node] = min(lowlinks[node], index[successor])
+    def finish(node: T) -> None:
+        # All successors of `node` are done; return to its predecessor
+        work_stack.pop()
+        if work_stack:
+            predecessor = work_stack[-1][0]
+            lowlinks[predecessor] = min(lowlinks[predecessor], lowlinks[node])
 
         # If `node` is a root node, pop the stack and generate an SCC
         if lowlinks[node] == index[node]:
@@ -47,6 +46,7 @@ def strongly_connected_components(graph: Mapping[T, Sequence[T]]) -> Sequence[Tu
 
             while True:
                 successor = stack.pop()
+                on_stack.discard(successor)
                 connected_component.append(successor)
                 if successor == node:
                     break
@@ -54,8 +54,25 @@ def strongly_connected_components(graph: Mapping[T, Sequence[T]]) -> Sequence[Tu
             # storing the result
             result.append(component)
 
-    for node in graph:
-        if node not in lowlinks:
-            strongconnect(node)
+    for root in graph:
+        if root in lowlinks:
+            continue
+
+        strongconnect(root)
+        while work_stack:
+            node, successors = work_stack[-1]
+
+            # Consider successors of `node`
+            for successor in successors:
+                if successor not in lowlinks:
+                    # Successor has not yet been visited; descend into it
+                    strongconnect(successor)
+                    break
+                if successor in on_stack:
+                    # the successor is in the stack and hence in the current
+                    # strongly connected component (SCC)
+                    lowlinks[node] = min(lowlinks[node], index[successor])
+            else:
+                finish(node)
 
     return result
@@ -1,48 +1,140 @@
 #!/usr/bin/env python3
 
 import ast
+import functools
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterator, NamedTuple, Sequence
+from typing import Any, Callable, Iterable, Iterator, Mapping, NamedTuple, Sequence
 
+from . import __version__
+from .caches import FilesCache, make_digest
 from .log import logger
 from .modules import Module, ModuleFactory, ModuleName, NamespacePackage, RegularPackage
 
+_MIN_FILES_PER_WORKER = 32
+
+# Bump if the format of the cached import statements or the way they are collected changes
+_CACHE_FORMAT = 3
+
 STDLIB_OR_BUILTIN = sys.stdlib_module_names.union(sys.builtin_module_names)
-ImportSTMT = ast.Import | ast.ImportFrom
 
 
-class NodeVisitorImports(ast.NodeVisitor):
+# Only the names of the import statements are kept instead of the AST nodes: They are much
+# cheaper to make, to pass between processes and to cache.
+class ImportStmt(NamedTuple):
+    names: Sequence[str]
+
+
+class ImportFromStmt(NamedTuple):
+    module: None | str
+    names: Sequence[str]
+    level: int
+
+
+AnyImportStmt = ImportStmt | ImportFromStmt
+
+# Import statements only occur within statement lists, ie. the bodies of the module, of compound
+# statements, of exception handlers or of match cases. Expressions never contain statements, thus
+# all other fields are not visited at all.
+_BLOCK_FIELDS = frozenset(["body", "orelse", "handlers", "finalbody", "cases"])
+
+
+def _make_child_fields() -> Mapping[type[ast.AST], tuple[str, ...]]:
+    # Maps the node types to their statement list fields. The fields are stored in reversed
+    # order: 'NodeVisitorImports._visit' pushes them onto its stack one after another, thus the
+    # first field is popped first.
+    node_types: list[type[ast.AST]] = [ast.Module, ast.ExceptHandler, ast.match_case]
+    node_types.extend(ast.stmt.__subclasses__())
+
+    child_fields: dict[type[ast.AST], tuple[str, ...]] = {}
+    for node_type in node_types:
+        if fields := tuple(f for f in node_type._fields if f in _BLOCK_FIELDS):
+            child_fields[node_type] = fields[::-1]
+    return child_fields
+
+
+_CHILD_FIELDS = _make_child_fields()
+
+
+def _skip_scope(_node: ast.AST) -> bool:
+    return False
+
+
+class NodeVisitorImports:
     def __init__(self, skip_type_checking: bool = False) -> None:
-        self._import_stmts: list[ImportSTMT] = []
+        self._import_stmts: list[AnyImportStmt] = []
         self._skip_type_checking = skip_type_checking
+        # Dispatch on the exact node type instead of 'ast.NodeVisitor.visit' which formats and
+        # looks up 'visit_<ClassName>' for every single node of the tree. The handlers return
+        # whether the child-entries of the node have to be visited.
+        self._dispatch: dict[type[ast.AST], Callable[[Any], bool]] = {
+            ast.Import: self._visit_import,
+            ast.ImportFrom: self._visit_import_from,
+            ast.If: self._visit_if,
+        }
+        # Functions and classes have their own scopes
+        self._toplevel_dispatch: dict[type[ast.AST], Callable[[Any], bool]] = {
+            **self._dispatch,
+            ast.FunctionDef: _skip_scope,
+            ast.AsyncFunctionDef: _skip_scope,
+            ast.ClassDef: _skip_scope,
+        }
 
     @property
-    def import_stmts(self) -> Sequence[ImportSTMT]:
+    def import_stmts(self) -> Sequence[AnyImportStmt]:
         return self._import_stmts
 
-    def visit_If(self, node: ast.If) -> None:
-        # Returning here will lead to the 'visit_Import' and 'visit_ImportFrom' methods not being
-        # called for the child-entries of this node.
+    def visit(self, tree: ast.AST) -> None:
+        self._visit(tree, self._dispatch)
+
+    def visit_toplevel(self, tree: ast.Module) -> None:
+        # Only collect the import statements of the module scope, ie. do not visit the bodies of
+        # functions or classes. Imports within conditions, try or with statements of the module
+        # scope are executed on import, too, thus they are kept.
+        self._visit(tree, self._toplevel_dispatch)
+
+    @staticmethod
+    def _visit(tree: ast.AST, dispatch: Mapping[type[ast.AST], Callable[[Any], bool]]) -> None:
+        # Shared by both modes: 'dispatch' is either '_dispatch' or '_toplevel_dispatch'. A
+        # handler returning False prunes the node, otherwise its statement list fields of
+        # '_CHILD_FIELDS' are walked.
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if (visit_node := dispatch.get(type(node))) is not None and not visit_node(node):
+                continue
+            for field in _CHILD_FIELDS.get(type(node), ()):
+                # The entries are reversed, too, in order to visit them in source order
+                stack.extend(reversed(getattr(node, field)))
+
+    def _visit_if(self, node: ast.If) -> bool:
+        # Returning False here will lead to the import statements not being collected for the
+        # child-entries of this node.
         if self._skip_type_checking:
             if isinstance(node.test, ast.Name):
                 # Simplistic name matching. Should be sufficient.
                 if node.test.id == "TYPE_CHECKING":
-                    return
+                    return False
             elif isinstance(node.test, ast.Attribute):
                 if node.test.attr == "TYPE_CHECKING":
-                    return
+                    return False
         if isinstance(node.test, ast.Constant):
             # Skip disabled imports (with if 0, if False, etc.)
             if not node.test.value:
-                return
-        super().generic_visit(node)
+                return False
+        return True
 
-    def visit_Import(self, node: ast.Import) -> None:
-        self._import_stmts.append(node)
+    def _visit_import(self, node: ast.Import) -> bool:
+        self._import_stmts.append(ImportStmt([alias.name for alias in node.names]))
+        return False
 
-    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
-        self._import_stmts.append(node)
+    def _visit_import_from(self, node: ast.ImportFrom) -> bool:
+        self._import_stmts.append(
+            ImportFromStmt(node.module, [alias.name for alias in node.names], node.level)
+        )
+        return False
 
 
 class ImportStmtsParser:
@@ -50,15 +142,20 @@ class ImportStmtsParser:
         self,
         module_factory: ModuleFactory,
         base_module: Module,
-        import_stmts: Sequence[ImportSTMT],
+        import_stmts: Sequence[AnyImportStmt],
     ) -> None:
         self._module_factory = module_factory
         self._base_module = base_module
         self._import_stmts = import_stmts
 
     def get_imports(self) -> Iterator[Module]:
-        for module_name in self._get_module_names():
-            if not module_name.parts or module_name.parts[0] in STDLIB_OR_BUILTIN:
+        # The same names are often mentioned by several import statements (eg. the anchor of
+        # 'from a import b' and 'from a import c') and different names may lead to the same
+        # module. Keep the first occurrence only. Builtin or stdlib modules are already skipped
+        # while collecting the module names.
+        seen: set[Module] = set()
+        for module_name in dict.fromkeys(self._get_module_names()):
+            if not module_name.parts:
                 continue
 
             try:
@@ -67,41 +164,59 @@ class ImportStmtsParser:
             except ValueError:
                 continue
 
-            yield module
+            if module not in seen:
+                seen.add(module)
+                yield module
 
     def _get_module_names(self) -> Iterator[ModuleName]:
         for import_stmt in self._import_stmts:
-            if isinstance(import_stmt, ast.Import):
+            if isinstance(import_stmt, ImportStmt):
                 yield from self._get_module_names_of_import_stmt(import_stmt)
 
-            elif isinstance(import_stmt, ast.ImportFrom):
+            elif isinstance(import_stmt, ImportFromStmt):
                 yield from self._get_module_names_of_import_from_stmt(import_stmt)
 
-    # -----ast.Import-----
+    # -----import-----
 
-    def _get_module_names_of_import_stmt(self, import_stmt: ast.Import) -> Iterator[ModuleName]:
-        for alias in import_stmt.names:
-            yield ModuleName(alias.name)
+    def _get_module_names_of_import_stmt(self, import_stmt: ImportStmt) -> Iterator[ModuleName]:
+        for name in import_stmt.names:
+            # Checked on the plain name in order to not make module names of stdlib imports
+            if not _is_builtin_or_stdlib_name(name):
+                yield ModuleName(name)
 
-    # -----ast.ImportFrom-----
+    # -----from-import-----
 
     def _get_module_names_of_import_from_stmt(
-        self, import_from_stmt: ast.ImportFrom
+        self, import_from_stmt: ImportFromStmt
     ) -> Iterator[ModuleName]:
         try:
-            yield (anchor := self._get_anchor(import_from_stmt))
+            anchor = self._get_anchor(import_from_stmt)
         except ValueError:
             return
 
-        for alias in import_from_stmt.names:
+        if _is_builtin_or_stdlib(anchor):
+            # All imported names share the top-level package of the anchor. Skip them here
+            # instead of making and filtering a module name for every single alias.
+            return
+
+        yield anchor
+
+        # An empty anchor, eg. of 'from . import json' in a top-level module, makes every
+        # imported name a top-level name of its own
+        check_names = not anchor.parts
+
+        for name in import_from_stmt.names:
+            if check_names and _is_builtin_or_stdlib_name(name):
+                continue
+
             # Add packages/modules to above prefix:
             # 1 -> ../a/b/c{.py,/}
             # 2 -> ../BASE/c{.py,/}
             # 3 -> ../BASE/a/b/c{.py,/}
             # 4 -> ../BASE_PARENT/a/b/c{.py,/}
-            yield anchor.joinname(alias.name)
+            yield anchor.joinname(name)
 
-    def _get_anchor(self, import_from_stmt: ast.ImportFrom) -> ModuleName:
+    def _get_anchor(self, import_from_stmt: ImportFromStmt) -> ModuleName:
         # Handle the cases:
         # 1 from a.b import c (module == "a.b", level == 0)
         #   -> Python module/package: ../a/b{.py,/}
@@ -117,7 +232,7 @@ class ImportStmtsParser:
             raise ValueError(import_from_stmt.module)
 
         try:
-            parent = self._base_module.name.parents[import_from_stmt.level - 1]
+            parent = self._base_module_parents[import_from_stmt.level - 1]
         except IndexError:
             parent = ModuleName()
 
@@ -125,6 +240,11 @@ class ImportStmtsParser:
 
     # -----helper-----
 
+    @functools.cached_property
+    def _base_module_parents(self) -> Sequence[ModuleName]:
+        # Computed once per module instead of once per relative import statement
+        return self._base_module.name.parents
+
     def _validate_module(self, module: Module) -> None:
         if module == self._base_module or (
             isinstance(module, RegularPackage)
@@ -134,14 +254,138 @@ class ImportStmtsParser:
             raise ValueError(module)
 
 
+def _is_builtin_or_stdlib(module_name: ModuleName) -> bool:
+    return bool(module_name.parts) and module_name.parts[0] in STDLIB_OR_BUILTIN
+
+
+def _is_builtin_or_stdlib_name(name: str) -> bool:
+    # Only the top-level package matters, eg. 'os' of 'os.path'
+    return name.partition(".")[0] in STDLIB_OR_BUILTIN
+
+
 class ImportsOfModule(NamedTuple):
     module: Module
     imports: Sequence[Module]
 
 
-def visit_python_file(
-    module_factory: ModuleFactory, path: Path, skip_type_checking: bool = False
-) -> None | ImportsOfModule:
+class VisitOptions(NamedTuple):
+    skip_type_checking: bool = False
+    only_toplevel: bool = False
+
+
+class _ParsedPythonFile(NamedTuple):
+    import_stmts: Sequence[AnyImportStmt]
+    digest: str = ""
+    error: str = ""
+
+
+def visit_python_files(
+    module_factory: ModuleFactory,
+    paths: Iterable[Path],
+    options: VisitOptions = VisitOptions(),
+    cache: None | FilesCache = None,
+    jobs: None | int = None,
+) -> Iterator[ImportsOfModule]:
+    modules = [module for path in paths if (module := _make_module(module_factory, path))]
+
+    import_stmts_by_module: dict[Module, Sequence[AnyImportStmt]] = {}
+    modules_to_parse: list[Module] = []
+    for module, cached in zip(
+        modules,
+        [None] * len(modules) if cache is None else cache.get_many([m.path for m in modules]),
+    ):
+        if cached is None:
+            modules_to_parse.append(module)
+        else:
+            import_stmts_by_module[module] = _load_import_stmts(cached)
+
+    for module, parsed in zip(
+        modules_to_parse,
+        _map_parse_python_files(
+            functools.partial(_parse_python_file, options=options, with_digest=cache is not None),
+            [module.path for module in modules_to_parse],
+            jobs,
+        ),
+    ):
+        if parsed.error:
+            logger.debug(parsed.error)
+            continue
+
+        import_stmts_by_module[module] = parsed.import_stmts
+        if cache is not None:
+            cache.set(module.path, parsed.digest, _dump_import_stmts(parsed.import_stmts))
+
+    for module in modules:
+        if (import_stmts := import_stmts_by_module.get(module)) is None:
+            continue
+
+        parser = ImportStmtsParser(
+            module_factory,
+            module,
+            import_stmts,
+        )
+
+        yield ImportsOfModule(
+            module,
+            sorted(parser.get_imports(), key=lambda m: tuple(m.name.parts), reverse=True),
+        )
+
+
+def get_cache_version(options: VisitOptions) -> str:
+    # The collected import statements depend on the options, on the code collecting them and on
+    # the interpreter: The grammar of 'ast.parse', the statement list fields and the stdlib
+    # module names differ between Python versions.
+    return "-".join(
+        [
+            __version__,
+            str(_CACHE_FORMAT),
+            f"{sys.implementation.name}{sys.version_info.major}.{sys.version_info.minor}",
+            *(str(int(o)) for o in options),
+        ]
+    )
+
+
+def _dump_import_stmts(import_stmts: Sequence[AnyImportStmt]) -> list[list[Any]]:
+    return [
+        (
+            ["import", import_stmt.names]
+            if isinstance(import_stmt, ImportStmt)
+            else ["from", import_stmt.names, import_stmt.module, import_stmt.level]
+        )
+        for import_stmt in import_stmts
+    ]
+
+
+def _load_import_stmts(rows: Sequence[Sequence[Any]]) -> Sequence[AnyImportStmt]:
+    return [
+        ImportStmt(row[1]) if row[0] == "import" else ImportFromStmt(row[2], row[1], row[3])
+        for row in rows
+    ]
+
+
+def _map_parse_python_files(
+    parse: Callable[[Path], _ParsedPythonFile],
+    paths: Sequence[Path],
+    jobs: None | int,
+) -> Iterator[_ParsedPythonFile]:
+    # Reading and parsing is CPU bound and independent per file, thus it's done by a pool of
+    # processes. Only the collected import statements are passed back and resolved by the
+    # caller, so that the module factory is shared by all files.
+    if (workers := _get_workers(jobs, len(paths))) <= 1:
+        yield from map(parse, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # A few chunks per worker keep the workers busy until the end
+        yield from executor.map(parse, paths, chunksize=max(1, len(paths) // (workers * 4)))
+
+
+def _get_workers(jobs: None | int, number_of_paths: int) -> int:
+    # Starting the processes does not pay off for a few files
+    return min(jobs or os.cpu_count() or 1, number_of_paths // _MIN_FILES_PER_WORKER)
+
+
+def _make_module(module_factory: ModuleFactory, path: Path) -> None | Module:
     try:
         module = module_factory.make_module_from_path(path)
     except ValueError:
@@ -150,29 +394,37 @@ def visit_python_file(
     if isinstance(module, NamespacePackage):
         return None
 
+    return module
+
+
+def _parse_python_file(
+    path: Path,
+    options: VisitOptions,
+    with_digest: bool,
+) -> _ParsedPythonFile:
     try:
-        with open(module.path, encoding="utf-8") as f:
-            content = f.read()
+        raw_content = path.read_bytes()
+        content = raw_content.decode("utf-8")
     except UnicodeDecodeError as e:
-        logger.debug("Cannot read python file %s: %s", module.path, e)
-        return None
+        return _ParsedPythonFile([], error=f"Cannot read python file {path}: {e}")
+
+    # The digest is only needed for the cache entry of the file
+    digest = make_digest(raw_content) if with_digest else ""
+
+    if "import" not in content:
+        # Cheap pre-filter: No import statements without the keyword, eg. empty '__init__.py'
+        return _ParsedPythonFile([], digest)
 
     try:
-        tree = ast.parse(content)
+        # Type comments are not needed for imports. The filename is reported on errors.
+        tree = ast.parse(content, filename=str(path), mode="exec", type_comments=False)
     except SyntaxError as e:
-        logger.debug("Cannot visit python file %s: %s", module.path, e)
-        return None
+        return _ParsedPythonFile([], error=f"Cannot visit python file {path}: {e}")
 
-    visitor = NodeVisitorImports(skip_type_checking=skip_type_checking)
-    visitor.visit(tree)
+    visitor = NodeVisitorImports(skip_type_checking=options.skip_type_checking)
+    if options.only_toplevel:
+        visitor.visit_toplevel(tree)
+    else:
+        visitor.visit(tree)
 
-    parser = ImportStmtsParser(
-        module_factory,
-        module,
-        visitor.import_stmts,
-    )
-
-    return ImportsOfModule(
-        module,
-        sorted(parser.get_imports(), key=lambda m: tuple(m.name.parts), reverse=True),
-    )
+    return _ParsedPythonFile(visitor.import_stmts, digest)
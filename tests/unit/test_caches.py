@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from py_import_cycles.caches import FilesCache, make_digest  # pylint: disable=import-error
+
+
+def _setup(tmp_path: Path) -> tuple[Path, Path]:
+    filepath = tmp_path / "mod.py"
+    filepath.write_text("import foo")
+    return filepath, tmp_path / "cache" / "cache.json"
+
+
+def test_cache_miss(tmp_path: Path) -> None:
+    filepath, cache_filepath = _setup(tmp_path)
+    assert FilesCache(cache_filepath, "1").get(filepath) is None
+
+
+def test_cache_hit(tmp_path: Path) -> None:
+    filepath, cache_filepath = _setup(tmp_path)
+    cache = FilesCache(cache_filepath, "1")
+    assert cache.get(filepath) is None
+    cache.set(filepath, make_digest(filepath.read_bytes()), [["import", ["foo"]]])
+    cache.save()
+
+    assert FilesCache(cache_filepath, "1").get(filepath) == [["import", ["foo"]]]
+
+
+def test_cache_changed_file(tmp_path: Path) -> None:
+    filepath, cache_filepath = _setup(tmp_path)
+    cache = FilesCache(cache_filepath, "1")
+    cache.get(filepath)
+    cache.set(filepath, make_digest(filepath.read_bytes()), [["import", ["foo"]]])
+    cache.save()
+
+    filepath.write_text("import foo, bar")
+
+    assert FilesCache(cache_filepath, "1").get(filepath) is None
+
+
+def test_cache_changed_mtime_same_content(tmp_path: Path) -> None:
+    filepath, cache_filepath = _setup(tmp_path)
+    cache = FilesCache(cache_filepath, "1")
+    cache.get(filepath)
+    cache.set(filepath, make_digest(filepath.read_bytes()), [["import", ["foo"]]])
+    cache.save()
+
+    stat_result = os.stat(filepath)
+    os.utime(filepath, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1))
+
+    assert FilesCache(cache_filepath, "1").get(filepath) == [["import", ["foo"]]]
+
+
+def test_cache_changed_mtime_same_size(tmp_path: Path) -> None:
+    filepath, cache_filepath = _setup(tmp_path)
+    cache = FilesCache(cache_filepath, "1")
+    cache.get(filepath)
+    cache.set(filepath, make_digest(filepath.read_bytes()), [["import", ["foo"]]])
+    cache.save()
+
+    stat_result = os.stat(filepath)
+    filepath.write_text("import bar")
+    os.utime(filepath, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1))
+
+    assert FilesCache(cache_filepath, "1").get(filepath) is None
+
+
+def test_cache_changed_version(tmp_path: Path) -> None:
+    filepath, cache_filepath = _setup(tmp_path)
+    cache = FilesCache(cache_filepath, "1")
+    cache.get(filepath)
+    cache.set(filepath, make_digest(filepath.read_bytes()), [["import", ["foo"]]])
+    cache.save()
+
+    assert FilesCache(cache_filepath, "2").get(filepath) is None
+
+
+def test_cache_corrupted(tmp_path: Path) -> None:
+    filepath, cache_filepath = _setup(tmp_path)
+    cache_filepath.parent.mkdir()
+    cache_filepath.write_text("{")
+
+    assert FilesCache(cache_filepath, "1").get(filepath) is None
+
+
+@pytest.mark.parametrize(
+    "entries",
+    [
+        [1],
+        "entries",
+        {"mod.py": 1},
+        {"mod.py": []},
+        {"mod.py": [1, "digest", []]},
+        {"mod.py": [[1], "digest", []]},
+        {"mod.py": [["1", 2], "digest", []]},
+        {"mod.py": [[1, 2], None, []]},
+        {"mod.py": [[1, 2], "digest"]},
+    ],
+)
+def test_cache_malformed_entries(tmp_path: Path, entries: Any) -> None:
+    filepath, cache_filepath = _setup(tmp_path)
+    # The key of the file itself in order to reach the lookups of the entry
+    if isinstance(entries, dict):
+        entries = {str(filepath): entry for entry in entries.values()}
+    cache_filepath.parent.mkdir()
+    cache_filepath.write_text(json.dumps({"version": "1", "entries": entries}))
+
+    cache = FilesCache(cache_filepath, "1")
+    assert cache.get(filepath) is None
+    cache.set(filepath, make_digest(filepath.read_bytes()), [["import", ["foo"]]])
+    cache.save()
+
+    assert FilesCache(cache_filepath, "1").get(filepath) == [["import", ["foo"]]]
+
+
+def test_cache_save_used_entries_only(tmp_path: Path) -> None:
+    filepath, cache_filepath = _setup(tmp_path)
+    other_filepath = tmp_path / "other.py"
+    other_filepath.write_text("import bar")
+
+    cache = FilesCache(cache_filepath, "1")
+    for path in [filepath, other_filepath]:
+        cache.get(path)
+        cache.set(path, make_digest(path.read_bytes()), [])
+    cache.save()
+
+    cache = FilesCache(cache_filepath, "1")
+    cache.get(filepath)
+    cache.save()
+
+    cache = FilesCache(cache_filepath, "1")
+    assert cache.get(filepath) == []  # pylint: disable=use-implicit-booleaness-not-comparison
+    assert cache.get(other_filepath) is None
+
+
+def test_cache_get_many(tmp_path: Path) -> None:
+    filepaths = [tmp_path / f"mod{nr}.py" for nr in range(3)]
+    for filepath in filepaths:
+        filepath.write_text(f"import foo{len(filepath.name)}")
+    cache_filepath = tmp_path / "cache" / "cache.json"
+
+    cache = FilesCache(cache_filepath, "1")
+    assert cache.get_many(filepaths) == [None, None, None]
+    for filepath in filepaths:
+        cache.set(filepath, make_digest(filepath.read_bytes()), filepath.name)
+    cache.save()
+
+    # Unchanged, touched and changed
+    stat_result = os.stat(filepaths[1])
+    os.utime(filepaths[1], ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1))
+    filepaths[2].write_text("import bar")
+
+    assert FilesCache(cache_filepath, "1").get_many(filepaths) == ["mod0.py", "mod1.py", None]
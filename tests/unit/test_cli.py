@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+
+import argparse
+
+import pytest
+
+from py_import_cycles.cli import _positive_int  # pylint: disable=import-error
+
+
+@pytest.mark.parametrize("value, expected", [("1", 1), ("4", 4)])
+def test_positive_int(value: str, expected: int) -> None:
+    assert _positive_int(value) == expected
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "", "two", "1.5"])
+def test_positive_int_error(value: str) -> None:
+    with pytest.raises(argparse.ArgumentTypeError):
+        _positive_int(value)
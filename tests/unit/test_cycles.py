@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+from pathlib import Path
+from typing import Literal, Mapping, Sequence
+
+import pytest
+
+from py_import_cycles.cycles import detect_cycles  # pylint: disable=import-error
+from py_import_cycles.modules import Module, ModuleName, PyModule  # pylint: disable=import-error
+
+
+def _module(name: str) -> Module:
+    return PyModule(path=Path(f"{name}.py"), name=ModuleName(name))
+
+
+@pytest.mark.parametrize(
+    "graph, cycles",
+    [
+        ({}, []),
+        ({"a": ["b"]}, []),
+        ({"a": ["a"]}, [("a",)]),
+        ({"a": ["b"], "b": ["a"]}, [("b", "a")]),
+        ({"a": ["b", "c"], "b": ["a"], "c": ["c"]}, [("b", "a"), ("c",)]),
+    ],
+)
+@pytest.mark.parametrize("strategy", ["dfs", "tarjan"])
+def test_detect_cycles(
+    strategy: Literal["dfs", "tarjan"],
+    graph: Mapping[str, Sequence[str]],
+    cycles: Sequence[tuple[str, ...]],
+) -> None:
+    module_graph = {_module(k): [_module(v) for v in vs] for k, vs in graph.items()}
+    assert sorted(
+        tuple(str(m.name) for m in cycle) for cycle in detect_cycles(strategy, module_graph)
+    ) == sorted(cycles)
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import sys
 from typing import Mapping, Sequence, Tuple
 
 import pytest
@@ -84,3 +85,10 @@ def test_cycles_str(
     cycles: Sequence[Tuple[str, ...]],
 ) -> None:
     assert list(depth_first_search(graph)) == cycles
+
+
+def test_long_cycle() -> None:
+    # Deeper than the default recursion limit
+    length = 5 * sys.getrecursionlimit()
+    graph = {node: [(node + 1) % length] for node in range(length)}
+    assert [sorted(c) for c in depth_first_search(graph)] == [list(range(length))]
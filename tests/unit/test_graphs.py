@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+from pathlib import Path
+
+from py_import_cycles.graphs import _write_graph, ImportEdge  # pylint: disable=import-error
+from py_import_cycles.modules import (  # pylint: disable=import-error
+    ModuleName,
+    PyModule,
+    RegularPackage,
+)
+
+
+def test_write_graph(tmp_path: Path) -> None:
+    module_a = PyModule(path=Path("a/b.py"), name=ModuleName("a.b"))
+    package_c = RegularPackage(path=Path("c/__init__.py"), name=ModuleName("c"))
+    filepath = tmp_path / "graph.gv"
+
+    _write_graph(
+        filepath,
+        [
+            ImportEdge("", module_a, package_c, "#00ff00"),
+            ImportEdge("1 (2)", package_c, module_a, "#ff0000"),
+        ],
+    )
+
+    assert filepath.read_text() == (
+        "digraph unix {\n"
+        "\t{\n"
+        '\t\t"a.b" [shape=""]\n'
+        '\t\t"c" [shape="box"]\n'
+        '\t\t"a.b" -> "c" [color="#00ff00"]\n'
+        '\t\t"c" -> "a.b" [label="1 (2)" color="#ff0000"]\n'
+        "\t}\n"
+        "}\n"
+    )
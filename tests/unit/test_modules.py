@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import pickle
 from pathlib import Path
 from typing import Sequence
 
@@ -259,3 +260,33 @@ def test_make_module_from_path_python_module(
 def test_make_module_from_path_error() -> None:
     with pytest.raises(ValueError):
         ModuleFactory(Path("/path/to/project"), []).make_module_from_path(Path("a/b/c"))
+
+
+def test_make_module_from_name_memoized(tmp_path: Path) -> None:
+    project_folder = tmp_path / "path/to/project"
+    project_folder.mkdir(parents=True, exist_ok=True)
+    module_filepath = project_folder / "a.py"
+    module_filepath.write_text("")
+
+    module_factory = ModuleFactory(project_folder, [])
+    module = module_factory.make_module_from_name(ModuleName("a"))
+    with pytest.raises(ValueError):
+        module_factory.make_module_from_name(ModuleName("b"))
+
+    module_filepath.unlink()
+    (project_folder / "b.py").write_text("")
+
+    assert module_factory.make_module_from_name(ModuleName("a")) == module
+    with pytest.raises(ValueError):
+        module_factory.make_module_from_name(ModuleName("b"))
+
+
+def test_module_name_pickle() -> None:
+    module_name = ModuleName("a", "b")
+    unpickled = pickle.loads(pickle.dumps(module_name))
+    assert unpickled == module_name
+    assert hash(unpickled) == hash(module_name)
+
+
+def test_module_name_str_shared() -> None:
+    assert str(ModuleName("a.b")) is str(ModuleName("a", "b"))
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import sys
+
 from py_import_cycles.tarjan import (
     strongly_connected_components as scc,  # pylint: disable=import-error
 )
@@ -111,3 +113,10 @@ def test_graph_with_more_cycles() -> None:
         (223, 222, 22, 2),
         (333, 33, 31, 3),
     ]
+
+
+def test_long_cycle() -> None:
+    # Deeper than the default recursion limit
+    length = 5 * sys.getrecursionlimit()
+    graph = {node: [(node + 1) % length] for node in range(length)}
+    assert [sorted(c) for c in scc(graph)] == [list(range(length))]
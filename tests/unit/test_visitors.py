@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 import ast
+import functools
+import sys
+from pathlib import Path
 
 import pytest
 
 from py_import_cycles import visitors
+from py_import_cycles.caches import FilesCache, make_digest
+from py_import_cycles.modules import ModuleFactory
+from py_import_cycles.visitors import _get_workers, _map_parse_python_files, _parse_python_file
 
 
 @pytest.mark.parametrize(
@@ -58,3 +64,217 @@ def test_visit_python_file(content: str, count: int, skip: bool) -> None:
     visitor = visitors.NodeVisitorImports(skip_type_checking=skip)
     visitor.visit(tree)
     assert len(visitor.import_stmts) == count
+
+
+def test_visit_python_file_source_order() -> None:
+    tree = ast.parse("import a\nif 1:\n  import b\n  if 1:\n    import c\nimport d")
+    visitor = visitors.NodeVisitorImports()
+    visitor.visit(tree)
+    assert [name for stmt in visitor.import_stmts for name in stmt.names] == [
+        "a",
+        "b",
+        "c",
+        "d",
+    ]
+
+
+@pytest.mark.parametrize(
+    ["content", "count"],
+    [
+        ("def f():\n  import foo", 1),
+        ("async def f():\n  import foo", 1),
+        ("class C:\n  import foo\n  def f(self):\n    import bar", 2),
+        ("try:\n  import foo\nexcept ImportError:\n  import bar\nelse:\n  pass", 2),
+        ("try:\n  pass\nfinally:\n  import foo", 1),
+        ("with open('f') as f:\n  import foo", 1),
+        ("for x in y:\n  import foo\nelse:\n  import bar", 2),
+        ("while x:\n  import foo", 1),
+        ("match x:\n  case 1:\n    import foo\n  case _:\n    import bar", 2),
+        ("x = lambda: __import__('foo')", 0),
+    ],
+)
+def test_visit_python_file_nested_blocks(content: str, count: int) -> None:
+    tree = ast.parse(content)
+    visitor = visitors.NodeVisitorImports()
+    visitor.visit(tree)
+    assert len(visitor.import_stmts) == count
+
+
+@pytest.mark.parametrize(
+    ["content", "count"],
+    [
+        ("", 0),
+        ("import foo\nfrom bar import baz", 2),
+        ("import foo\ndef f():\n  import bar", 1),
+        ("import foo\nasync def f():\n  import bar", 1),
+        ("import foo\nclass C:\n  import bar", 1),
+        ("import foo\nclass C:\n  def f(self):\n    import bar", 1),
+        ("from typing import TYPE_CHECKING\nif TYPE_CHECKING:\n  import foo", 1),
+        ("try:\n  import foo\nexcept ImportError:\n  import bar", 2),
+        ("if True:\n  with x:\n    import foo\n  def f():\n    import bar", 1),
+    ],
+)
+def test_visit_toplevel(content: str, count: int) -> None:
+    tree = ast.parse(content)
+    visitor = visitors.NodeVisitorImports(skip_type_checking=True)
+    visitor.visit_toplevel(tree)
+    assert len(visitor.import_stmts) == count
+
+
+def test_get_imports_deduplicated(tmp_path: Path) -> None:
+    for filename in ["main.py", "a.py", "b.py"]:
+        (tmp_path / filename).write_text("")
+
+    module_factory = ModuleFactory(tmp_path, [])
+    visitor = visitors.NodeVisitorImports()
+    visitor.visit(ast.parse("import a\nfrom a import x\nfrom a import y\nimport b\nimport a"))
+    parser = visitors.ImportStmtsParser(
+        module_factory,
+        module_factory.make_module_from_path(tmp_path / "main.py"),
+        visitor.import_stmts,
+    )
+
+    assert [str(m.name) for m in parser.get_imports()] == ["a", "b"]
+
+
+def test_get_imports_skip_stdlib(tmp_path: Path) -> None:
+    for filename in ["main.py", "a.py"]:
+        (tmp_path / filename).write_text("")
+
+    module_factory = ModuleFactory(tmp_path, [])
+    visitor = visitors.NodeVisitorImports()
+    visitor.visit(ast.parse("import os.path, a\nfrom sys import path\nfrom os.path import join"))
+    parser = visitors.ImportStmtsParser(
+        module_factory,
+        module_factory.make_module_from_path(tmp_path / "main.py"),
+        visitor.import_stmts,
+    )
+
+    assert [str(m.name) for m in parser.get_imports()] == ["a"]
+
+
+def test_get_imports_skip_stdlib_of_empty_anchor(tmp_path: Path) -> None:
+    for filename in ["main.py", "json.py", "a.py"]:
+        (tmp_path / filename).write_text("")
+
+    module_factory = ModuleFactory(tmp_path, [])
+    visitor = visitors.NodeVisitorImports()
+    visitor.visit(ast.parse("from . import json, a"))
+    parser = visitors.ImportStmtsParser(
+        module_factory,
+        module_factory.make_module_from_path(tmp_path / "main.py"),
+        visitor.import_stmts,
+    )
+
+    assert [str(m.name) for m in parser.get_imports()] == ["a"]
+
+
+def test_visit_python_files_cached(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    project_path = tmp_path / "project"
+    for filename, content in [
+        ("pkg/__init__.py", "from .a import x"),
+        ("pkg/a.py", "from . import b\nfrom .b import y\nimport pkg.c\nx = 1"),
+        ("pkg/b.py", "from ..pkg import a\ny = 2"),
+        ("pkg/c.py", "from .sub.d import z"),
+        ("pkg/sub/__init__.py", ""),
+        ("pkg/sub/d.py", "from ...pkg import b as z"),
+    ]:
+        (project_path / filename).parent.mkdir(parents=True, exist_ok=True)
+        (project_path / filename).write_text(content)
+
+    paths = sorted(project_path.rglob("*.py"))
+    cache_filepath = tmp_path / "cache.json"
+    version = visitors.get_cache_version(visitors.VisitOptions())
+
+    def _visit(cache: None | FilesCache) -> list[tuple[str, list[str]]]:
+        return [
+            (str(visited.module.name), [str(m.name) for m in visited.imports])
+            for visited in visitors.visit_python_files(
+                ModuleFactory(project_path, []), paths, cache=cache
+            )
+        ]
+
+    cache = FilesCache(cache_filepath, version)
+    cold = _visit(cache)
+    cache.save()
+
+    def _fail_parse_python_file(
+        path: Path, options: visitors.VisitOptions, with_digest: bool
+    ) -> None:
+        raise AssertionError(f"{path} is not cached")
+
+    monkeypatch.setattr(visitors, "_parse_python_file", _fail_parse_python_file)
+    warm = _visit(FilesCache(cache_filepath, version))
+
+    assert cold == warm
+    assert cold == [
+        ("pkg.__init__", ["pkg.a"]),
+        ("pkg.a", ["pkg.c", "pkg.b"]),
+        ("pkg.b", ["pkg.a"]),
+        ("pkg.c", ["pkg.sub.d"]),
+        ("pkg.sub.__init__", []),
+        ("pkg.sub.d", ["pkg.b", "pkg.__init__"]),
+    ]
+
+
+@pytest.mark.parametrize(
+    ["jobs", "number_of_paths", "cpu_count", "expected"],
+    [
+        (None, 0, 4, 0),
+        (None, 31, 4, 0),
+        (None, 64, 4, 2),
+        (None, 1000, 4, 4),
+        (None, 1000, None, 1),
+        (1, 1000, 4, 1),
+        (2, 1000, 4, 2),
+        (8, 1000, 4, 8),
+        (8, 100, 4, 3),
+    ],
+)
+def test_get_workers(
+    monkeypatch: pytest.MonkeyPatch,
+    jobs: None | int,
+    number_of_paths: int,
+    cpu_count: None | int,
+    expected: int,
+) -> None:
+    monkeypatch.setattr(visitors.os, "cpu_count", lambda: cpu_count)
+    assert _get_workers(jobs, number_of_paths) == expected
+
+
+def test_map_parse_python_files_pool(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    paths = []
+    for nr in range(6):
+        paths.append(path := tmp_path / f"mod{nr}.py")
+        path.write_text(f"import mod{nr + 1}\nfrom . import mod{nr + 2}\nif x:\n  import y{nr}")
+    paths.append(path := tmp_path / "broken.py")
+    path.write_text("import")
+
+    parse = functools.partial(_parse_python_file, options=visitors.VisitOptions(), with_digest=True)
+    serial = list(_map_parse_python_files(parse, paths, 1))
+
+    # Force the pool for a few files
+    monkeypatch.setattr(visitors, "_MIN_FILES_PER_WORKER", 1)
+    assert _get_workers(2, len(paths)) == 2
+    pooled = list(_map_parse_python_files(parse, paths, 2))
+
+    assert pooled == serial
+    assert [len(parsed.import_stmts) for parsed in serial] == [3, 3, 3, 3, 3, 3, 0]
+    assert serial[-1].error
+
+
+@pytest.mark.parametrize("with_digest", [True, False])
+def test_parse_python_file_digest(tmp_path: Path, with_digest: bool) -> None:
+    path = tmp_path / "mod.py"
+    path.write_text("import foo")
+
+    parsed = _parse_python_file(path, visitors.VisitOptions(), with_digest)
+
+    assert parsed.import_stmts == [visitors.ImportStmt(["foo"])]
+    assert parsed.digest == (make_digest(path.read_bytes()) if with_digest else "")
+
+
+def test_get_cache_version() -> None:
+    version = visitors.get_cache_version(visitors.VisitOptions())
+    assert f"{sys.implementation.name}{sys.version_info.major}.{sys.version_info.minor}" in version
+    assert version != visitors.get_cache_version(visitors.VisitOptions(only_toplevel=True))
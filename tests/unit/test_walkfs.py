@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 
+import os
 from pathlib import Path
+from typing import Any
 
 import pytest
 
@@ -91,3 +93,64 @@ def test_recurse_dirs(root: Path) -> None:
         setup_py_file(p)
 
     assert frozenset(iter_python_files(root, [Path("p1"), Path("p2")])) == proj
+
+
+def test_ignore_symlinks(root: Path) -> None:
+    proj = {root / "p" / "p.py"}
+    for p in proj:
+        setup_py_file(p)
+
+    other = root / "other"
+    setup_py_file(other / "o.py")
+    (root / "p" / "link.py").symlink_to(other / "o.py")
+    (root / "p" / "link").symlink_to(other, target_is_directory=True)
+
+    assert frozenset(iter_python_files(root, [Path("p")])) == proj
+
+
+def test_ignore_dirs_with_py_extention(root: Path) -> None:
+    proj = {root / "p" / "p.py", root / "p" / "d.py" / "p.py"}
+    for p in proj:
+        setup_py_file(p)
+
+    assert frozenset(iter_python_files(root, [Path("p")])) == proj
+
+
+def test_resolve_project_path(root: Path) -> None:
+    proj = {root / "p" / "p.py", root / "p" / "p1" / "p.py"}
+    for p in proj:
+        setup_py_file(p)
+
+    link = root.parent / "link"
+    link.symlink_to(root, target_is_directory=True)
+
+    assert frozenset(iter_python_files(link / "p" / "..", [Path("p")])) == proj
+
+
+def test_nested_packages(root: Path) -> None:
+    proj = [root / "p" / "p.py", root / "p" / "p1" / "p.py"]
+    for p in proj:
+        setup_py_file(p)
+
+    assert sorted(iter_python_files(root, [Path("p"), Path("p/p1"), Path("p")])) == proj
+
+
+def test_ignore_unreadable_dirs(root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    proj = {root / "p" / "p.py"}
+    for p in proj:
+        setup_py_file(p)
+
+    unreadable = root / "p" / "unreadable"
+    setup_py_file(unreadable / "u.py")
+
+    # 'chmod 000' has no effect when running as root, thus fake the denied access
+    scandir = os.scandir
+
+    def _scandir(path: Any) -> Any:
+        if Path(path) == unreadable:
+            raise PermissionError(13, "Permission denied", str(path))
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", _scandir)
+
+    assert frozenset(iter_python_files(root, [Path("p")])) == proj